@@ -1,4 +1,4 @@
-import time
+import math
 from netmiko.base_connection import BaseConnection
 
 
@@ -22,5 +22,10 @@ class F5TmshSSH(BaseConnection):
         self.clear_buffer()
         command = f"{self.RETURN}tmsh{self.RETURN}"
         self.write_channel(command)
-        time.sleep(1 * delay_factor)
+        # Wait for the tmsh prompt, i.e. admin@(bigip1)(cfg-sync Standalone)(Active)(/Common)(tmos)#
+        # delay_factor can only extend the timeout (never shorten it)
+        self.read_until_pattern(
+            pattern=r"\(tmos\)#",
+            timeout=max(self.read_timeout, math.ceil(self.read_timeout * delay_factor)),
+        )
         self.clear_buffer()
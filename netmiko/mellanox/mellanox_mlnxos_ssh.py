@@ -49,17 +49,24 @@ class MellanoxMlnxosSSH(CiscoSSHConnection):
     def exit_config_mode(self, exit_config: str = "exit", pattern: str = "#") -> str:
         """Mellanox does not support a single command to completely exit configuration mode.
 
-        Consequently, need to keep checking and sending "exit".
+        Consequently, need to keep sending "exit". The exits cannot be sent as one batch as
+        an "exit" outside of configuration mode terminates the CLI session. Instead the
+        prompt returned after each "exit" is used to determine whether to continue (confirmed
+        by check_config_mode() as other output can follow the prompt).
         """
         output = ""
         check_count = 12
-        while check_count >= 0:
-            if self.check_config_mode():
+        if self.check_config_mode():
+            while check_count >= 0:
                 self.write_channel(self.normalize_cmd(exit_config))
-                output += self.read_until_pattern(pattern=pattern)
-            else:
-                break
-            check_count -= 1
+                new_output = self.read_until_pattern(pattern=pattern)
+                output += new_output
+                lines = new_output.strip().splitlines()
+                if not lines or "(config" not in lines[-1]:
+                    # i.e. a syslog message after the prompt; fall back to checking
+                    if not self.check_config_mode():
+                        break
+                check_count -= 1
 
         # One last check for whether we successfully exited config mode
         if self.check_config_mode():
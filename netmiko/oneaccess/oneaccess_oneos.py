@@ -1,7 +1,6 @@
 """Netmiko driver for OneAccess ONEOS"""
 from typing import Any
 from netmiko.cisco_base_connection import CiscoBaseConnection
-import time
 
 
 class OneaccessOneOSBase(CiscoBaseConnection):
@@ -17,8 +16,7 @@ class OneaccessOneOSBase(CiscoBaseConnection):
         self.set_base_prompt()
         self.set_terminal_width(command="stty columns 255", pattern="stty")
         self.disable_paging(command="term len 0")
-        # Clear the read buffer
-        time.sleep(0.3 * self.global_delay_factor)
+        # Clear the read buffer (clear_buffer waits/backs off while data is arriving)
         self.clear_buffer()
 
     def save_config(
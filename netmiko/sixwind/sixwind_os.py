@@ -1,5 +1,4 @@
 from typing import Any
-import time
 from netmiko.cisco_base_connection import CiscoBaseConnection
 
 
@@ -9,8 +8,7 @@ class SixwindOSBase(CiscoBaseConnection):
         self.ansi_escape_codes = True
         self._test_channel_read()
         self.set_base_prompt()
-        # Clear the read buffer
-        time.sleep(0.3 * self.global_delay_factor)
+        # Clear the read buffer (clear_buffer waits/backs off while data is arriving)
         self.clear_buffer()
 
     def disable_paging(self, *args: Any, **kwargs: Any) -> str:
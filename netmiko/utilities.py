@@ -1,14 +1,11 @@
 """Miscellaneous utility functions."""
-from glob import glob
 import sys
-import io
 import os
 import re
+import time
 from pathlib import Path
 import functools
-from datetime import datetime
 
-from typing import AnyStr
 from typing import Dict, List, Union, Callable, Any, Optional, Tuple
 from typing import TYPE_CHECKING
 
@@ -38,11 +35,11 @@ try:
 except ImportError:
     GENIE_INSTALLED = False
 
-# If we are on python < 3.7, we need to force the import of importlib.resources backport
+# If we are on python < 3.9, we need to force the import of importlib.resources backport
 try:
-    from importlib.resources import path as importresources_path  # type: ignore
-except ModuleNotFoundError:
-    from importlib_resources import path as importresources_path
+    from importlib.resources import files as importresources_files  # type: ignore
+except ImportError:
+    from importlib_resources import files as importresources_files
 
 try:
     import serial.tools.list_ports
@@ -81,16 +78,32 @@ SHOW_RUN_MAPPER = {
 }
 
 # Expand SHOW_RUN_MAPPER to include '_ssh' key
-new_dict = {}
-for k, v in SHOW_RUN_MAPPER.items():
-    new_key = k + "_ssh"
-    new_dict[k] = v
-    new_dict[new_key] = v
-SHOW_RUN_MAPPER = new_dict
+SHOW_RUN_MAPPER = {
+    **SHOW_RUN_MAPPER,
+    **{f"{k}_ssh": v for k, v in SHOW_RUN_MAPPER.items()},
+}
 
 # Default location of netmiko temp directory for netmiko tools
 NETMIKO_BASE_DIR = "~/.netmiko"
 
+# Resolve the user's home directory once
+_HOME_DIR = os.path.expanduser("~")
+
+# ANSI escape codes that are removed by strip_ansi_escape_codes(). These are all
+# ESC[ (CSI) sequences and are combined into a single regex below.
+_ANSI_ESCAPE_CODES = (
+    r"[\d;]*m",  # graphics mode / colors, attributes off, reverse (ESC[00;32m, ESC[m)
+    r"\d*K",  # erase line (ESC[K, ESC[2K)
+    r"\d*J",  # erase display (ESC[J, ESC[2J)
+    r"\d+;\d+[Hr]",  # position cursor, enable scrolling
+    r"\?\d+[hl]",  # show cursor, disable line wrapping, reset mode screen options
+    r"\d+[DM]",  # cursor left, carriage return (ESC[1M)
+    r"6n",  # get cursor position
+)
+_ANSI_ESCAPE_RE = re.compile(r"\x1b\[(?:" + "|".join(_ANSI_ESCAPE_CODES) + ")")
+_CODE_NEXT_LINE_RE = re.compile(r"\x1bE")
+_CODE_INSERT_LINE_RE = re.compile(r"\x1b\[(\d+)L")
+
 
 def load_yaml_file(yaml_file: str) -> Any:
     """Read YAML file."""
@@ -99,8 +112,10 @@ def load_yaml_file(yaml_file: str) -> Any:
     except ImportError:
         sys.exit("Unable to import yaml module.")
     try:
-        with io.open(yaml_file, "rt", encoding="utf-8") as fname:
-            return yaml.safe_load(fname)
+        # Use the libyaml based loader when PyYAML was built with it
+        yaml_loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(yaml_file, "rb") as fname:
+            return yaml.load(fname, Loader=yaml_loader)
     except IOError:
         sys.exit(f"Unable to open YAML file: {yaml_file}")
 
@@ -126,13 +141,14 @@ def find_cfg_file(file_name: Optional[str] = None) -> str:
     optional_path = os.environ.get("NETMIKO_TOOLS_CFG", "")
     if os.path.isfile(optional_path):
         return optional_path
-    search_paths = [optional_path, ".", os.path.expanduser("~")]
+    search_paths = [optional_path, ".", _HOME_DIR]
     # Filter optional_path if null
     search_paths = [path for path in search_paths if path]
     for path in search_paths:
-        files = glob(f"{path}/.netmiko.yml") + glob(f"{path}/netmiko.yml")
-        if files:
-            return files[0]
+        for cfg_file in (".netmiko.yml", "netmiko.yml"):
+            full_path = os.path.join(path, cfg_file)
+            if os.path.isfile(full_path):
+                return full_path
     raise IOError(
         ".netmiko.yml file not found in NETMIKO_TOOLS environment variable directory,"
         " current directory, or home directory."
@@ -181,8 +197,8 @@ def obtain_netmiko_filename(device_name: str) -> str:
 
 def write_tmp_file(device_name: str, output: str) -> str:
     file_name = obtain_netmiko_filename(device_name)
-    with open(file_name, "w") as f:
-        f.write(output)
+    with open(file_name, "wb") as f:
+        f.write(output.encode("utf-8", errors="replace"))
     return file_name
 
 
@@ -204,6 +220,12 @@ def find_netmiko_dir() -> Tuple[str, str]:
         netmiko_base_dir = os.environ["NETMIKO_DIR"]
     except KeyError:
         netmiko_base_dir = NETMIKO_BASE_DIR
+    return _find_netmiko_dir(netmiko_base_dir)
+
+
+@functools.lru_cache(maxsize=8)
+def _find_netmiko_dir(netmiko_base_dir: str) -> Tuple[str, str]:
+    """Cached on the (unexpanded) base directory so NETMIKO_DIR changes are honored."""
     netmiko_base_dir = os.path.expanduser(netmiko_base_dir)
     if netmiko_base_dir == "/":
         raise ValueError("/ cannot be netmiko_base_dir")
@@ -211,15 +233,18 @@ def find_netmiko_dir() -> Tuple[str, str]:
     return (netmiko_base_dir, netmiko_full_dir)
 
 
-def write_bytes(out_data: AnyStr, encoding: str = "ascii") -> bytes:
-    if sys.version_info[0] >= 3:
-        if isinstance(out_data, type("")):
-            if encoding == "utf-8":
-                return out_data.encode("utf-8")
-            else:
-                return out_data.encode("ascii", "ignore")
-        elif isinstance(out_data, type(b"")):
-            return out_data
+def write_bytes(
+    out_data: Union[str, bytes, bytearray, memoryview], encoding: str = "ascii"
+) -> bytes:
+    if isinstance(out_data, str):
+        if encoding == "utf-8":
+            return out_data.encode("utf-8")
+        else:
+            return out_data.encode("ascii", "ignore")
+    elif isinstance(out_data, bytes):
+        return out_data
+    elif isinstance(out_data, (bytearray, memoryview)):
+        return bytes(out_data)
     msg = "Invalid value for out_data neither unicode nor byte string"
     raise ValueError(msg)
 
@@ -259,10 +284,21 @@ def get_template_dir(_skip_ntc_package: bool = False) -> str:
 
     If `index` file is not found in any of these locations, raise ValueError
 
+    The result is cached (keyed on the `NET_TEXTFSM` value) as it is looked up on
+    every TextFSM parsing operation.
+
     :return: directory containing the TextFSM index file
 
     """
+    template_dir = os.environ.get("NET_TEXTFSM")
+    if template_dir is not None:
+        # Resolve relative paths here so the cache key is independent of the cwd
+        template_dir = os.path.abspath(os.path.expanduser(template_dir))
+    return _get_template_dir(template_dir, _skip_ntc_package)
+
 
+@functools.lru_cache(maxsize=8)
+def _get_template_dir(template_dir: Optional[str], _skip_ntc_package: bool) -> str:
     msg = """
 Directory containing TextFSM index file not found.
 
@@ -274,9 +310,7 @@ Alternatively, `pip install ntc-templates` (if using ntc-templates).
 """
 
     # Try NET_TEXTFSM environment variable
-    template_dir = os.environ.get("NET_TEXTFSM")
     if template_dir is not None:
-        template_dir = os.path.expanduser(template_dir)
         index = os.path.join(template_dir, "index")
         if not os.path.isfile(index):
             # Assume only base ./ntc-templates specified
@@ -285,19 +319,15 @@ Alternatively, `pip install ntc-templates` (if using ntc-templates).
     else:
         # Try 'pip installed' ntc-templates
         try:
-            with importresources_path(
-                package="ntc_templates", resource="templates"
-            ) as posix_path:
-                # Example: /opt/venv/netmiko/lib/python3.8/site-packages/ntc_templates/templates
-                template_dir = str(posix_path)
-                # This is for Netmiko automated testing
-                if _skip_ntc_package:
-                    raise ModuleNotFoundError()
+            # Example: /opt/venv/netmiko/lib/python3.8/site-packages/ntc_templates/templates
+            template_dir = str(importresources_files("ntc_templates") / "templates")
+            # This is for Netmiko automated testing
+            if _skip_ntc_package:
+                raise ModuleNotFoundError()
 
         except ModuleNotFoundError:
             # Finally check in ~/ntc-templates/templates
-            home_dir = os.path.expanduser("~")
-            template_dir = os.path.join(home_dir, "ntc-templates", "templates")
+            template_dir = os.path.join(_HOME_DIR, "ntc-templates", "templates")
 
     index = os.path.join(template_dir, "index")
     if not os.path.isdir(template_dir) or not os.path.isfile(index):
@@ -307,13 +337,8 @@ Alternatively, `pip install ntc-templates` (if using ntc-templates).
 
 def clitable_to_dict(cli_table: "CliTable") -> List[Dict[str, Any]]:
     """Converts TextFSM cli_table object to list of dictionaries."""
-    objs = []
-    for row in cli_table:
-        temp_dict = {}
-        for index, element in enumerate(row):
-            temp_dict[cli_table.header[index].lower()] = element
-        objs.append(temp_dict)
-    return objs
+    headers = tuple(header.lower() for header in cli_table.header)
+    return [dict(zip(headers, row)) for row in cli_table]
 
 
 def _textfsm_parse(
@@ -329,13 +354,13 @@ def _textfsm_parse(
             textfsm_obj.ParseCmd(raw_output, templates=template_file)  # type: ignore
         else:
             textfsm_obj.ParseCmd(raw_output, attrs)  # type: ignore
-        structured_data = clitable_to_dict(textfsm_obj)
-        if structured_data == []:
+        # Nothing parsed, no need to convert the table
+        if textfsm_obj.size == 0:
             assert isinstance(raw_output, str)
             return raw_output
-        else:
-            assert isinstance(structured_data, list)
-            return structured_data
+        structured_data = clitable_to_dict(textfsm_obj)
+        assert isinstance(structured_data, list)
+        return structured_data
     except (FileNotFoundError, CliTableError):
         return raw_output
 
@@ -474,11 +499,10 @@ def select_cmd_verify(func: Callable[..., Any]) -> Callable[..., Any]:
 def m_exec_time(func: Callable[..., Any]) -> Callable[..., Any]:
     @functools.wraps(func)
     def wrapper_decorator(self: object, *args: Any, **kwargs: Any) -> Any:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         result = func(self, *args, **kwargs)
-        end_time = datetime.now()
-        method_name = str(func)
-        print(f"{method_name}: Elapsed time: {end_time - start_time}")
+        elapsed_time = time.perf_counter() - start_time
+        print(f"{func.__qualname__}: Elapsed time: {elapsed_time:.6f}s")
         return result
 
     return wrapper_decorator
@@ -487,10 +511,10 @@ def m_exec_time(func: Callable[..., Any]) -> Callable[..., Any]:
 def f_exec_time(func: Callable[..., Any]) -> Callable[..., Any]:
     @functools.wraps(func)
     def wrapper_decorator(*args: Any, **kwargs: Any) -> Any:
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = datetime.now()
-        print(f"Elapsed time: {end_time - start_time}")
+        elapsed_time = time.perf_counter() - start_time
+        print(f"{func.__qualname__}: Elapsed time: {elapsed_time:.6f}s")
         return result
 
     return wrapper_decorator
@@ -528,69 +552,19 @@ def strip_ansi_escape_codes(string_buffer: str, return_str: str = "\n") -> str:
     :type string_buffer: str
     """  # noqa
 
-    code_position_cursor = chr(27) + r"\[\d+;\d+H"
-    code_show_cursor = chr(27) + r"\[\?25h"
-    code_next_line = chr(27) + r"E"
-    code_erase_line_end = chr(27) + r"\[K"
-    code_erase_line = chr(27) + r"\[2K"
-    code_erase_start_line = chr(27) + r"\[K"
-    code_enable_scroll = chr(27) + r"\[\d+;\d+r"
-    code_insert_line = chr(27) + r"\[(\d+)L"
-    code_carriage_return = chr(27) + r"\[1M"
-    code_disable_line_wrapping = chr(27) + r"\[\?7l"
-    code_reset_mode_screen_options = chr(27) + r"\[\?\d+l"
-    code_reset_graphics_mode = chr(27) + r"\[00m"
-    code_erase_display = chr(27) + r"\[2J"
-    code_erase_display_0 = chr(27) + r"\[J"
-    code_graphics_mode = chr(27) + r"\[\d\d;\d\dm"
-    code_graphics_mode2 = chr(27) + r"\[\d\d;\d\d;\d\dm"
-    code_graphics_mode3 = chr(27) + r"\[(3|4)\dm"
-    code_graphics_mode4 = chr(27) + r"\[(9|10)[0-7]m"
-    code_get_cursor_position = chr(27) + r"\[6n"
-    code_cursor_position = chr(27) + r"\[m"
-    code_attrs_off = chr(27) + r"\[0m"
-    code_reverse = chr(27) + r"\[7m"
-    code_cursor_left = chr(27) + r"\[\d+D"
-
-    code_set = [
-        code_position_cursor,
-        code_show_cursor,
-        code_erase_line,
-        code_enable_scroll,
-        code_erase_start_line,
-        code_carriage_return,
-        code_disable_line_wrapping,
-        code_erase_line_end,
-        code_reset_mode_screen_options,
-        code_reset_graphics_mode,
-        code_erase_display,
-        code_graphics_mode,
-        code_graphics_mode2,
-        code_graphics_mode3,
-        code_graphics_mode4,
-        code_get_cursor_position,
-        code_cursor_position,
-        code_erase_display,
-        code_erase_display_0,
-        code_attrs_off,
-        code_reverse,
-        code_cursor_left,
-    ]
-
-    # FIX - so that this is not a loop, but a single regex invocation using
-    # a logical or (compare performance of the two).
-    output = string_buffer
-    for ansi_esc_code in code_set:
-        output = re.sub(ansi_esc_code, "", output)
+    # Every code starts with ESC; most output doesn't contain any
+    if "\x1b" not in string_buffer:
+        return string_buffer
+
+    output = _ANSI_ESCAPE_RE.sub("", string_buffer)
 
     # CODE_NEXT_LINE must substitute with return
-    output = re.sub(code_next_line, return_str, output)
+    output = _CODE_NEXT_LINE_RE.sub(return_str, output)
 
     # Aruba and ProCurve switches can use code_insert_line for <enter>
-    insert_line_match = re.search(code_insert_line, output)
-    if insert_line_match:
-        # Substitute each insert_line with a new <enter>
-        count = int(insert_line_match.group(1))
-        output = re.sub(code_insert_line, count * return_str, output)
+    # Substitute each insert_line with its own count of <enter>
+    output = _CODE_INSERT_LINE_RE.sub(
+        lambda match: int(match.group(1)) * return_str, output
+    )
 
     return output
@@ -52,7 +52,7 @@ setup(
         "tenacity",
         "ntc-templates",
         "pyserial",
-        "importlib_resources ; python_version<'3.7'",
+        "importlib_resources>=1.1 ; python_version<'3.9'",
     ],
     extras_require={"test": ["pyyaml>=5.1.2", "pytest>=5.1.2"]},
 )
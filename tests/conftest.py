@@ -2,6 +2,7 @@
 """py.test fixtures to be used in netmiko test suite."""
 from os import path
 import os
+import socket
 
 import pytest
 
@@ -23,6 +24,42 @@ def pytest_addoption(parser):
     )
 
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "platforms(base_platforms, reason): only run the test on these base platforms",
+    )
+
+
+def pytest_runtest_setup(item):
+    """
+    Skip tests marked with 'platforms' that don't apply to the device under test.
+
+    This runs before the test's fixtures are setup so no connection is established for
+    skipped tests.
+    """
+    marker = item.get_closest_marker("platforms")
+    if marker is None:
+        return
+    device_under_test = item.config.getoption("test_device")
+    test_devices = parse_yaml(PWD + "/etc/test_devices.yml")
+    base_platform = test_devices[device_under_test]["device_type"]
+    if base_platform.count("_") >= 2:
+        # Strip off the _ssh, _telnet, _serial
+        base_platform = base_platform.rsplit("_", 1)[0]
+    if base_platform not in marker.args[0]:
+        pytest.skip(marker.kwargs.get("reason", f"Not supported on {base_platform}"))
+
+
+def _set_tcp_nodelay(conn):
+    """Disable Nagle's algorithm on the SSH socket as the tests do many small writes."""
+    if conn.protocol == "ssh":
+        sock = conn.channel.remote_conn.get_transport().sock
+        # sock can also be a proxy (i.e. ProxyCommand)
+        if isinstance(sock, socket.socket):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
 @pytest.fixture(scope="module")
 def net_connect(request):
     """
@@ -35,6 +72,7 @@ def net_connect(request):
     device = test_devices[device_under_test]
     device["verbose"] = False
     conn = ConnectHandler(**device)
+    _set_tcp_nodelay(conn)
     return conn
 
 
@@ -53,6 +91,7 @@ def net_connect_cmd_verify(request):
     device["verbose"] = False
     device["global_cmd_verify"] = False
     conn = ConnectHandler(**device)
+    _set_tcp_nodelay(conn)
     return conn
 
 
@@ -69,6 +108,7 @@ def net_connect_newconn(request):
     device = test_devices[device_under_test]
     device["verbose"] = False
     conn = ConnectHandler(**device)
+    _set_tcp_nodelay(conn)
     return conn
 
 
@@ -84,6 +124,7 @@ def net_connect_cm(request):
     device["verbose"] = False
     my_prompt = ""
     with ConnectHandler(**device) as conn:
+        _set_tcp_nodelay(conn)
         my_prompt = conn.find_prompt()
     return my_prompt
 
@@ -103,6 +144,7 @@ def net_connect_slog_wr(request):
     device["session_log"] = "SLOG/cisco881_slog_wr.log"
     device["session_log_record_writes"] = True
     conn = ConnectHandler(**device)
+    _set_tcp_nodelay(conn)
     return conn
 
 
@@ -121,7 +163,7 @@ def device_slog(request):
     return device
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def expected_responses(request):
     """
     Parse the responses.yml file to get a responses dictionary
@@ -131,7 +173,7 @@ def expected_responses(request):
     return responses[device_under_test]
 
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def commands(request):
     """
     Parse the commands.yml file to get a commands dictionary
@@ -15,11 +15,29 @@ test_enable_mode: verify enter enable mode
 test_disconnect: cleanly disconnect the SSH session
 """
 import pytest
+import re
+import select
 import time
-import os
-from datetime import datetime
 from netmiko.utilities import select_cmd_verify
 
+# Base platforms (device_type without _ssh, _telnet, _serial) supporting each parser
+TEXTFSM_PLATFORMS = frozenset(
+    [
+        "cisco_ios",
+        "cisco_xe",
+        "cisco_xr",
+        "cisco_nxos",
+        "arista_eos",
+        "cisco_asa",
+        "juniper_junos",
+        "hp_procurve",
+    ]
+)
+TTP_PLATFORMS = frozenset(["cisco_ios"])
+GENIE_PLATFORMS = frozenset(
+    ["cisco_ios", "cisco_xe", "cisco_xr", "cisco_nxos", "cisco_asa"]
+)
+
 
 @select_cmd_verify
 def bogus_func(obj, *args, **kwargs):
@@ -27,31 +45,104 @@ def bogus_func(obj, *args, **kwargs):
     return (obj, args, kwargs)
 
 
-def test_disable_paging(net_connect, commands, expected_responses):
-    """Verify paging is disabled by looking for string after when paging would normally occur."""
+def _drain(net_connect, idle_time=0.05, max_time=1.0):
+    """
+    Read the channel until no new data arrives for idle_time seconds (at most max_time).
+
+    SSH uses select() on the paramiko channel, other protocols fall back to sleep and
+    clear_buffer().
+    """
+    if net_connect.protocol != "ssh":
+        time.sleep(max_time)
+        net_connect.clear_buffer()
+        return
+    remote_conn = net_connect.channel.remote_conn
+    deadline = time.monotonic() + max_time
+    while time.monotonic() < deadline:
+        readable, _, _ = select.select([remote_conn], [], [], idle_time)
+        if not readable:
+            break
+        net_connect.read_channel()
+
+
+@pytest.fixture
+def net_connect_no_fast_cli(net_connect):
+    """net_connect with an empty channel; skip devices that use fast_cli."""
+    # Skip devices that are performance optimized (i.e. cmd_verify is required there)
+    if net_connect.fast_cli is True:
+        pytest.skip("cmd_verify is required on fast_cli devices")
+    _drain(net_connect)
+    return net_connect
+
+
+@pytest.fixture(scope="module")
+def batched_outputs(net_connect, commands):
+    """
+    Send the 'version' and 'extended_output' commands in a single write and then split the
+    output on the trailing prompts (one round-trip instead of one per command).
+
+    Return a dictionary of {command: output}.
+    """
     # FIX: these really shouldn't be necessary.
     if net_connect.device_type == "arista_eos":
         # Arista logging buffer gets enormous
         net_connect.send_command("clear logging")
-    elif net_connect.device_type == "arista_eos":
+    elif "nxos" in net_connect.device_type:
         # NX-OS logging buffer gets enormous (NX-OS fails when testing very high-latency +
         # packet loss)
         net_connect.send_command("clear logging logfile")
-    multiple_line_output = net_connect.send_command(commands["extended_output"])
+
+    # Many platforms use the same command for both (i.e. 'show version')
+    cmds = list(dict.fromkeys((commands["version"], commands["extended_output"])))
+    prompt = net_connect.find_prompt()
+    prompt_pattern = re.escape(prompt)
+    net_connect.write_channel("".join(net_connect.normalize_cmd(cmd) for cmd in cmds))
+    # Allow for long outputs and slow devices (similar to send_command's default of ~100s)
+    read_timeout = net_connect.read_timeout * 10
+    output = ""
+    while len(re.findall(prompt_pattern, output)) < len(cmds):
+        output += net_connect.read_until_pattern(
+            pattern=prompt_pattern, timeout=read_timeout
+        )
+    return dict(zip(cmds, output.split(prompt)))
+
+
+@pytest.fixture(scope="module")
+def command_outputs(net_connect, commands):
+    """
+    Run the 'basic' and 'version' commands once using both send_command_timing and
+    send_command.
+
+    Return a dictionary of {command: {method_name: output}}.
+    """
+    outputs = {}
+    for cmd in (commands["basic"], commands["version"]):
+        outputs[cmd] = {
+            "send_command_timing": net_connect.send_command_timing(cmd),
+            "send_command": net_connect.send_command(cmd),
+        }
+    return outputs
+
+
+def test_disable_paging(batched_outputs, commands, expected_responses):
+    """Verify paging is disabled by looking for string after when paging would normally occur."""
+    multiple_line_output = batched_outputs[commands["extended_output"]]
     assert expected_responses["multiple_line_output"] in multiple_line_output
 
 
-def test_terminal_width(net_connect, commands, expected_responses):
+def test_terminal_width(request, commands):
     """Verify long commands work properly."""
     wide_command = commands.get("wide_command")
-    if wide_command:
-        net_connect.send_command(wide_command)
-    assert True
+    if not wide_command:
+        pytest.skip("No wide_command defined for this platform")
+    # Only set up the SSH connection once we know the test will run
+    net_connect = request.getfixturevalue("net_connect")
+    net_connect.send_command(wide_command)
 
 
-def test_ssh_connect(net_connect, commands, expected_responses):
+def test_ssh_connect(batched_outputs, commands, expected_responses):
     """Verify the connection was established successfully."""
-    show_version = net_connect.send_command(commands["version"])
+    show_version = batched_outputs[commands["version"]]
     assert expected_responses["version_banner"] in show_version
 
 
@@ -63,19 +154,16 @@ def test_ssh_connect_cm(net_connect_cm, commands, expected_responses):
 
 def test_send_command_timing(net_connect, commands, expected_responses):
     """Verify a command can be sent down the channel successfully."""
-    time.sleep(1)
-    net_connect.clear_buffer()
+    _drain(net_connect)
     # Force verification of command echo
     show_ip = net_connect.send_command_timing(commands["basic"], cmd_verify=True)
     assert expected_responses["interface_ip"] in show_ip
 
 
-def test_send_command_timing_no_cmd_verify(net_connect, commands, expected_responses):
-    # Skip devices that are performance optimized (i.e. cmd_verify is required there)
-    if net_connect.fast_cli is True:
-        assert pytest.skip()
-    time.sleep(1)
-    net_connect.clear_buffer()
+def test_send_command_timing_no_cmd_verify(
+    net_connect_no_fast_cli, commands, expected_responses
+):
+    net_connect = net_connect_no_fast_cli
     # cmd_verify=False is the default
     show_ip = net_connect.send_command_timing(commands["basic"], cmd_verify=False)
     assert expected_responses["interface_ip"] in show_ip
@@ -88,11 +176,10 @@ def test_send_command(net_connect, commands, expected_responses):
     assert expected_responses["interface_ip"] in show_ip_alt
 
 
-def test_send_command_no_cmd_verify(net_connect, commands, expected_responses):
-    # Skip devices that are performance optimized (i.e. cmd_verify is required there)
-    if net_connect.fast_cli is True:
-        assert pytest.skip()
-    net_connect.clear_buffer()
+def test_send_command_no_cmd_verify(
+    net_connect_no_fast_cli, commands, expected_responses
+):
+    net_connect = net_connect_no_fast_cli
     show_ip_alt = net_connect.send_command(commands["basic"], cmd_verify=False)
     assert expected_responses["interface_ip"] in show_ip_alt
 
@@ -163,119 +250,70 @@ def test_complete_on_space_disabled(net_connect, commands, expected_responses):
         assert pytest.skip()
 
 
+@pytest.mark.platforms(
+    TEXTFSM_PLATFORMS, reason="TextFSM/ntc-templates not supported on this platform"
+)
 def test_send_command_textfsm(net_connect, commands, expected_responses):
     """Verify a command can be sent down the channel successfully using send_command method."""
-
-    base_platform = net_connect.device_type
-    if base_platform.count("_") >= 2:
-        # Strip off the _ssh, _telnet, _serial
-        base_platform = base_platform.split("_")[:-1]
-        base_platform = "_".join(base_platform)
-    if base_platform not in [
-        "cisco_ios",
-        "cisco_xe",
-        "cisco_xr",
-        "cisco_nxos",
-        "arista_eos",
-        "cisco_asa",
-        "juniper_junos",
-        "hp_procurve",
-    ]:
-        assert pytest.skip("TextFSM/ntc-templates not supported on this platform")
-    else:
-        time.sleep(1)
-        net_connect.clear_buffer()
-        fallback_cmd = commands.get("basic")
-        command = commands.get("basic_textfsm", fallback_cmd)
-        show_ip_alt = net_connect.send_command(command, use_textfsm=True)
-        assert isinstance(show_ip_alt, list)
+    _drain(net_connect)
+    fallback_cmd = commands.get("basic")
+    command = commands.get("basic_textfsm", fallback_cmd)
+    show_ip_alt = net_connect.send_command(command, use_textfsm=True)
+    assert isinstance(show_ip_alt, list)
 
 
-def test_send_command_ttp(net_connect):
+@pytest.mark.platforms(
+    TTP_PLATFORMS, reason="TTP template not existing for this platform"
+)
+def test_send_command_ttp(net_connect, tmp_path):
     """Test TTP parsing works correctly."""
+    _drain(net_connect)
 
-    base_platform = net_connect.device_type
-    if base_platform.count("_") >= 2:
-        # Strip off the _ssh, _telnet, _serial
-        base_platform = base_platform.split("_")[:-1]
-        base_platform = "_".join(base_platform)
-    if base_platform not in ["cisco_ios"]:
-        assert pytest.skip("TTP template not existing for this platform")
-    else:
-        time.sleep(1)
-        net_connect.clear_buffer()
-
-        # write a simple template to file
-        ttp_raw_template = """interface {{ intf }}
+    # write a simple template to file
+    ttp_raw_template = """interface {{ intf }}
  description {{ description }}
         """
-        ttp_temp_filename = "show_run_interfaces.ttp"
-        with open(ttp_temp_filename, "w") as writer:
-            writer.write(ttp_raw_template)
-
-        command = "show run"
-        show_ip_alt = net_connect.send_command(
-            command, use_ttp=True, ttp_template=ttp_temp_filename
-        )
-        os.remove(ttp_temp_filename)
-        assert isinstance(show_ip_alt, list)
-        # Ensures it isn't an empty data structure
-        assert isinstance(show_ip_alt[0]["intf"], str)
-
-
-def test_send_command_ttp_failed(net_connect):
+    ttp_temp_file = tmp_path / "show_run_interfaces.ttp"
+    ttp_temp_file.write_text(ttp_raw_template)
+
+    command = "show run"
+    show_ip_alt = net_connect.send_command(
+        command, use_ttp=True, ttp_template=str(ttp_temp_file)
+    )
+    assert isinstance(show_ip_alt, list)
+    # Ensures it isn't an empty data structure
+    assert isinstance(show_ip_alt[0]["intf"], str)
+
+
+@pytest.mark.platforms(
+    TTP_PLATFORMS, reason="TTP template not existing for this platform"
+)
+def test_send_command_ttp_failed(net_connect, tmp_path):
     """Failed TTP parsing should return raw_output."""
+    _drain(net_connect)
 
-    base_platform = net_connect.device_type
-    if base_platform.count("_") >= 2:
-        # Strip off the _ssh, _telnet, _serial
-        base_platform = base_platform.split("_")[:-1]
-        base_platform = "_".join(base_platform)
-    if base_platform not in ["cisco_ios"]:
-        assert pytest.skip("TTP template not existing for this platform")
-    else:
-        time.sleep(1)
-        net_connect.clear_buffer()
-
-        # Break template by having leading space
-        ttp_raw_template = """   interface {{ intf }}
+    # Break template by having leading space
+    ttp_raw_template = """   interface {{ intf }}
  description {{ description }}
         """
-        ttp_temp_filename = "show_run_interfaces.ttp"
-        with open(ttp_temp_filename, "w") as writer:
-            writer.write(ttp_raw_template)
+    ttp_temp_file = tmp_path / "show_run_interfaces.ttp"
+    ttp_temp_file.write_text(ttp_raw_template)
 
-        command = "show run"
-        show_ip_alt = net_connect.send_command(
-            command, use_ttp=True, ttp_template=ttp_temp_filename
-        )
-        os.remove(ttp_temp_filename)
-        assert isinstance(show_ip_alt, str)
+    command = "show run"
+    show_ip_alt = net_connect.send_command(
+        command, use_ttp=True, ttp_template=str(ttp_temp_file)
+    )
+    assert isinstance(show_ip_alt, str)
 
 
+@pytest.mark.platforms(GENIE_PLATFORMS, reason="Genie not supported on this platform")
 def test_send_command_genie(net_connect, commands, expected_responses):
     """Verify a command can be sent down the channel successfully using send_command method."""
-
-    base_platform = net_connect.device_type
-    if base_platform.count("_") >= 2:
-        # Strip off the _ssh, _telnet, _serial
-        base_platform = base_platform.split("_")[:-1]
-        base_platform = "_".join(base_platform)
-    if base_platform not in [
-        "cisco_ios",
-        "cisco_xe",
-        "cisco_xr",
-        "cisco_nxos",
-        "cisco_asa",
-    ]:
-        assert pytest.skip("Genie not supported on this platform")
-    else:
-        time.sleep(1)
-        net_connect.clear_buffer()
-        fallback_cmd = commands.get("basic")
-        command = commands.get("basic_textfsm", fallback_cmd)
-        show_ip_alt = net_connect.send_command(command, use_genie=True)
-        assert isinstance(show_ip_alt, dict)
+    _drain(net_connect)
+    fallback_cmd = commands.get("basic")
+    command = commands.get("basic_textfsm", fallback_cmd)
+    show_ip_alt = net_connect.send_command(command, use_genie=True)
+    assert isinstance(show_ip_alt, dict)
 
 
 def test_base_prompt(net_connect, commands, expected_responses):
@@ -283,48 +321,51 @@ def test_base_prompt(net_connect, commands, expected_responses):
     assert net_connect.base_prompt == expected_responses["base_prompt"]
 
 
-def test_strip_prompt(net_connect, commands, expected_responses):
+@pytest.mark.parametrize("method_name", ["send_command_timing", "send_command"])
+def test_strip_prompt(method_name, command_outputs, commands, expected_responses):
     """Ensure the router prompt is not in the command output."""
 
     if expected_responses["base_prompt"] == "":
         return
-    show_ip = net_connect.send_command_timing(commands["basic"])
-    show_ip_alt = net_connect.send_command(commands["basic"])
+    show_ip = command_outputs[commands["basic"]][method_name]
     assert expected_responses["base_prompt"] not in show_ip
-    assert expected_responses["base_prompt"] not in show_ip_alt
 
 
-def test_strip_command(net_connect, commands, expected_responses):
+@pytest.mark.parametrize("method_name", ["send_command_timing", "send_command"])
+def test_strip_command(
+    method_name, net_connect, command_outputs, commands, expected_responses
+):
     """Ensure that the command that was executed does not show up in the command output."""
-    show_ip = net_connect.send_command_timing(commands["basic"])
-    show_ip_alt = net_connect.send_command(commands["basic"])
+    show_ip = command_outputs[commands["basic"]][method_name]
 
     # dlink_ds has an echo of the command in the command output
     if "dlink_ds" in net_connect.device_type:
-        show_ip = "\n".join(show_ip.split("\n")[2:])
-        show_ip_alt = "\n".join(show_ip_alt.split("\n")[2:])
+        # Drop the first two lines
+        second_newline = show_ip.find("\n", show_ip.find("\n") + 1)
+        show_ip = show_ip[second_newline + 1 :] if second_newline != -1 else ""
     assert commands["basic"] not in show_ip
-    assert commands["basic"] not in show_ip_alt
 
 
-def test_normalize_linefeeds(net_connect, commands, expected_responses):
+def test_normalize_linefeeds(command_outputs, commands, expected_responses):
     """Ensure no '\r\n' sequences."""
-    show_version = net_connect.send_command_timing(commands["version"])
-    show_version_alt = net_connect.send_command(commands["version"])
-    assert "\r\n" not in show_version
-    assert "\r\n" not in show_version_alt
+    for method_name, show_version in command_outputs[commands["version"]].items():
+        assert "\r\n" not in show_version, method_name
 
 
 def test_clear_buffer(net_connect, commands, expected_responses):
     """Test that clearing the buffer works."""
     # Manually send a command down the channel so that data needs read.
     net_connect.write_channel(commands["basic"] + "\n")
-    time.sleep(4)
+    # Wait for data to show up in the channel (SSH can check without reading it)
+    if net_connect.protocol == "ssh":
+        select.select([net_connect.channel.remote_conn], [], [], 4)
+    else:
+        time.sleep(4)
+    # clear_buffer() keeps reading (with backoff) while data is still arriving
     net_connect.clear_buffer()
 
     # Should not be anything there on the second pass
-    clear_buffer_check = net_connect.clear_buffer()
-    assert clear_buffer_check is None
+    assert net_connect.read_channel() == ""
 
 
 def test_enable_mode(net_connect, commands, expected_responses):
@@ -343,11 +384,9 @@ def test_enable_mode(net_connect, commands, expected_responses):
 
 def test_disconnect(net_connect, commands, expected_responses):
     """Terminate the SSH session."""
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     net_connect.disconnect()
-    end_time = datetime.now()
-    time_delta = end_time - start_time
-    assert time_delta.total_seconds() < 8
+    assert time.perf_counter() - start_time < 8
     with pytest.raises(AttributeError) as e:  # noqa
         net_connect.channel.remote_conn
 
@@ -357,11 +396,9 @@ def test_disconnect_no_enable(net_connect_newconn, commands, expected_responses)
     net_connect = net_connect_newconn
     if "cisco_ios" in net_connect.device_type:
         net_connect.send_command_timing("disable")
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         net_connect.disconnect()
-        end_time = datetime.now()
-        time_delta = end_time - start_time
-        assert time_delta.total_seconds() < 5
+        assert time.perf_counter() - start_time < 5
         with pytest.raises(AttributeError) as e:  # noqa
             net_connect.channel.remote_conn
     else:
@@ -147,6 +147,16 @@ def test_bytes_to_bytes():
     assert utilities.write_bytes(result) == result
 
 
+def test_bytearray_memoryview_to_bytes():
+    """Convert bytearray and memoryview to bytes"""
+    result = utilities.write_bytes(bytearray(b"hello world"))
+    assert result == b"hello world"
+    assert isinstance(result, bytes)
+    result = utilities.write_bytes(memoryview(b"hello world")[6:])
+    assert result == b"world"
+    assert isinstance(result, bytes)
+
+
 def test_invalid_data_to_bytes():
     """Convert an invalid data type to bytes"""
     try:
@@ -419,6 +429,10 @@ def test_strip_ansi_codes():
         "\x1b[J",  # code_erase_display
         "\x1b[0m",  # code_attrs_off
         "\x1b[7m",  # code_reverse
+        "\x1b[2J",  # code_erase_display
+        "\x1b[1;31m",  # Bold red
+        "\x1b[01;34;42m",  # Bold blue on green
+        "\x1b[3D",  # code_cursor_left
     ]
     for ansi_code in ansi_codes_to_strip:
         assert utilities.strip_ansi_escape_codes(ansi_code) == ""
@@ -428,6 +442,12 @@ def test_strip_ansi_codes():
     assert utilities.strip_ansi_escape_codes(ansi_insert_line) == "\n"
     ansi_insert_line = "\x1b[3L"
     assert utilities.strip_ansi_escape_codes(ansi_insert_line) == "\n\n\n"
+    ansi_insert_line = "a\x1b[1Lb\x1b[2Lc"
+    assert utilities.strip_ansi_escape_codes(ansi_insert_line) == "a\nb\n\nc"
 
     # code_next_line must be substituted with a return
     assert utilities.strip_ansi_escape_codes("\x1bE") == "\n"
+
+    # Mixed codes in a single buffer
+    mixed = "\x1b[?25h\x1b[1;1Hhost\x1b[0;32m#\x1b[0m show\x1b[K\x1b[2Lversion\x1bE"
+    assert utilities.strip_ansi_escape_codes(mixed) == "host# show\n\nversion\n"